@@ -7,68 +7,195 @@ Calculates the 4 key DORA metrics:
 4. Time to Restore Service (MTTR)
 """
 import os
-import json
+import sys
+import functools
+import pickle
+import orjson
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from dateutil import parser
+from pathlib import Path
+
+MANIFEST_PATH = Path('metrics/.cache/manifest.pkl')
+ERRORS_LOG_PATH = Path('metrics/.cache/errors.log')
+
+# Below this many records the numba JIT compile costs more than pandas groupby
+NUMBA_MIN_ROWS = 100_000
+
+def read_metric_file(path):
+    """Read and parse a single metrics JSON file"""
+    try:
+        return orjson.loads(path.read_bytes()), None
+    except (OSError, orjson.JSONDecodeError) as e:
+        return None, e
+
+def load_manifest():
+    """Load the parsed-metrics cache from the previous run, if any"""
+    try:
+        with MANIFEST_PATH.open('rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+
+def save_manifest(manifest):
+    """Persist the parsed-metrics cache for the next run"""
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with MANIFEST_PATH.open('wb') as f:
+        pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 def load_metrics():
-    """Load all metrics JSON files"""
-    metrics = []
-    
-    raw_dir = 'metrics/raw'
-    if not os.path.exists(raw_dir):
+    """Load all metrics JSON files and their parsed timestamps
+    
+    Files whose (mtime, size) match the manifest cache are reused as-is,
+    only new or modified files are read and parsed. download_metrics leaves
+    already extracted artifacts untouched, so their keys stay stable.
+    """
+    raw_dir = Path('metrics/raw')
+    if not raw_dir.exists():
         print("No metrics directory found")
-        return []
-    
-    for root, dirs, files in os.walk(raw_dir):
-        for file in files:
-            if file.endswith('.json'):
-                filepath = os.path.join(root, file)
-                try:
-                    with open(filepath, 'r') as f:
-                        data = json.load(f)
-                        metrics.append(data)
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-    
-    return metrics
+        return [], parse_timestamps([])
+    
+    paths = sorted(raw_dir.rglob('*.json'))
+    cached = load_manifest()
+    manifest = {}
+    misses = []
+    
+    for path in paths:
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = cached.get(str(path))
+        if entry is not None and entry[0] == key:
+            manifest[str(path)] = entry
+        else:
+            misses.append((path, key))
+    
+    # Artifacts are many small files, so overlap the per-file open/read latency
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = executor.map(read_metric_file, [path for path, _ in misses])
+        parsed = []
+        errors = []
+        for (filepath, key), (data, error) in zip(misses, results):
+            if error is not None:
+                errors.append((str(filepath), repr(error)))
+            else:
+                parsed.append((str(filepath), key, data))
+    
+    # Report failures once instead of flushing stdout per file
+    if errors:
+        ERRORS_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        ERRORS_LOG_PATH.write_text('\n'.join(f'{path}\t{error}' for path, error in errors) + '\n')
+        sys.stderr.write(f"{len(errors)} files failed to load, see {ERRORS_LOG_PATH}\n")
+    else:
+        # Don't leave failures from an earlier run behind
+        ERRORS_LOG_PATH.unlink(missing_ok=True)
+    
+    new_timestamps = parse_timestamps([data for _, _, data in parsed])
+    for (path, key, data), ts in zip(parsed, new_timestamps.tz_convert(None).values):
+        manifest[path] = (key, data, ts)
+    
+    save_manifest(manifest)
+    
+    entries = [manifest[str(path)] for path in paths if str(path) in manifest]
+    metrics = [data for _, data, _ in entries]
+    timestamps = pd.DatetimeIndex(
+        np.array([ts for _, _, ts in entries], dtype='datetime64[ns]')
+    ).tz_localize('UTC')
+    
+    return metrics, timestamps
+
+def parse_timestamps(metrics):
+    """Parse every metric timestamp once, aligned with the metrics list"""
+    return pd.to_datetime(
+        [m['timestamp'] for m in metrics], utc=True, format='ISO8601', cache=True
+    )
+
+def bucket_timestamps(timestamps):
+    """Day numbers and weekly/monthly period ordinals, aligned with the timestamps"""
+    utc = timestamps.tz_convert(None)
+    days = utc.values.astype('datetime64[D]').view('i8')
+    weeks = utc.to_period('W').asi8
+    months = utc.to_period('M').asi8
+    return days, weeks, months
+
+def pack_keys(buckets, service_codes, n_services):
+    """Pack (bucket, service) pairs into one int64 key per row"""
+    return buckets * n_services + service_codes
+
+def unpack_keys(keys, n_services):
+    """Split packed keys back into bucket values and service codes"""
+    return keys // n_services, keys % n_services
 
-def calculate_deployment_frequency(metrics):
+def count_by_bucket(buckets, service_codes, n_services):
+    """Count rows per (bucket, service) pair, sorted by bucket then service"""
+    keys, counts = np.unique(pack_keys(buckets, service_codes, n_services), return_counts=True)
+    return *unpack_keys(keys, n_services), counts
+
+def calculate_deployment_frequency(metrics, timestamps, days, weeks, months):
     """Calculate deployment frequency per service"""
     
-    deployments = []
+    rows = []
+    services = []
+    deployment_ids = []
+    branches = []
+    commit_shas = []
     
-    for metric in metrics:
+    for i, metric in enumerate(metrics):
         if 'deployment_frequency' in metric:
-            deployments.append({
-                'timestamp': metric['timestamp'],
-                'service': metric['service'],
-                'deployment_id': metric['deployment_frequency']['deployment_id'],
-                'branch': metric['deployment_frequency'].get('branch', 'unknown'),
-                'commit_sha': metric['deployment_frequency'].get('commit_sha', '')
-            })
-    
-    df = pd.DataFrame(deployments)
+            deployment = metric['deployment_frequency']
+            
+            rows.append(i)
+            services.append(metric['service'])
+            deployment_ids.append(deployment['deployment_id'])
+            branches.append(deployment.get('branch', 'unknown'))
+            commit_shas.append(deployment.get('commit_sha', ''))
+    
+    df = pd.DataFrame({
+        'service': services,
+        'deployment_id': deployment_ids,
+        'branch': branches,
+        'commit_sha': commit_shas
+    })
+    df['service'] = df['service'].astype('category')
     
     if df.empty:
         return pd.DataFrame()
     
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['date'] = df['timestamp'].dt.date
-    
-    # Daily deployment frequency per service
-    daily_freq = df.groupby(['date', 'service']).size().reset_index(name='deployment_count')
+    days, weeks, months = days[rows], weeks[rows], months[rows]
     
-    # Weekly deployment frequency
-    df['week'] = df['timestamp'].dt.to_period('W')
-    weekly_freq = df.groupby(['week', 'service']).size().reset_index(name='deployment_count')
-    weekly_freq['week'] = weekly_freq['week'].astype(str)
-    
-    # Monthly deployment frequency
-    df['month'] = df['timestamp'].dt.to_period('M')
-    monthly_freq = df.groupby(['month', 'service']).size().reset_index(name='deployment_count')
-    monthly_freq['month'] = monthly_freq['month'].astype(str)
+    df.insert(0, 'timestamp', timestamps[rows])
+    df['date'] = df['timestamp'].dt.date
+    df['week'] = pd.PeriodIndex.from_ordinals(weeks, freq='W')
+    df['month'] = pd.PeriodIndex.from_ordinals(months, freq='M')
+    
+    # Service category codes double as the factorization for the packed int64 keys.
+    # Rows without a service have code -1 and are dropped, like groupby's NaN keys
+    service_codes = df['service'].cat.codes.to_numpy(dtype=np.int64)
+    service_names = df['service'].cat.categories
+    known = service_codes >= 0
+    days, weeks, months = days[known], weeks[known], months[known]
+    service_codes = service_codes[known]
+    
+    day, service, count = count_by_bucket(days, service_codes, len(service_names))
+    daily_freq = pd.DataFrame({
+        'date': pd.to_datetime(day, unit='D').date,
+        'service': service_names[service],
+        'deployment_count': count
+    })
+    
+    week, service, count = count_by_bucket(weeks, service_codes, len(service_names))
+    weekly_freq = pd.DataFrame({
+        'week': pd.PeriodIndex.from_ordinals(week, freq='W').astype(str),
+        'service': service_names[service],
+        'deployment_count': count
+    })
+    
+    month, service, count = count_by_bucket(months, service_codes, len(service_names))
+    monthly_freq = pd.DataFrame({
+        'month': pd.PeriodIndex.from_ordinals(month, freq='M').astype(str),
+        'service': service_names[service],
+        'deployment_count': count
+    })
     
     return {
         'daily': daily_freq,
@@ -77,106 +204,243 @@ def calculate_deployment_frequency(metrics):
         'raw': df
     }
 
-def calculate_lead_time(metrics):
+@functools.lru_cache(maxsize=None)
+def lead_time_kernels():
+    """Compile the numba group kernels, only needed for large inputs"""
+    from numba import njit
+    
+    @njit(cache=True)
+    def group_stats(group_ids, values, n_groups):
+        """Single pass sum, count, min and max of values per group id"""
+        total = np.zeros(n_groups)
+        count = np.zeros(n_groups, dtype=np.int64)
+        minimum = np.full(n_groups, np.inf)
+        maximum = np.full(n_groups, -np.inf)
+        
+        # Serial on purpose: scattering into shared group slots would race under prange
+        for i in range(len(values)):
+            g = group_ids[i]
+            v = values[i]
+            total[g] += v
+            count[g] += 1
+            if v < minimum[g]:
+                minimum[g] = v
+            if v > maximum[g]:
+                maximum[g] = v
+        
+        return total, count, minimum, maximum
+    
+    @njit(cache=True)
+    def group_medians(sorted_values, offsets):
+        """Median of each group, given values sorted by group and group offsets"""
+        n_groups = len(offsets) - 1
+        median = np.empty(n_groups)
+        
+        for g in range(n_groups):
+            median[g] = np.median(sorted_values[offsets[g]:offsets[g + 1]])
+        
+        return median
+    
+    return group_stats, group_medians
+
+def calculate_lead_time(metrics, timestamps, days):
     """Calculate lead time for changes"""
     
-    lead_times = []
+    rows = []
+    services = []
+    commit_shas = []
+    commit_timestamps = []
+    deploy_timestamps = []
     
-    for metric in metrics:
+    for i, metric in enumerate(metrics):
         if 'lead_time_for_changes' in metric:
             lt = metric['lead_time_for_changes']
             
-            commit_time = parser.parse(lt['commit_timestamp'])
-            deploy_time = parser.parse(lt['deploy_timestamp'])
-            
-            lead_time_seconds = (deploy_time - commit_time).total_seconds()
-            lead_time_hours = lead_time_seconds / 3600
-            lead_time_minutes = lead_time_seconds / 60
-            
-            lead_times.append({
-                'timestamp': metric['timestamp'],
-                'service': metric['service'],
-                'commit_sha': lt.get('commit_sha', ''),
-                'commit_timestamp': commit_time,
-                'deploy_timestamp': deploy_time,
-                'lead_time_seconds': lead_time_seconds,
-                'lead_time_minutes': lead_time_minutes,
-                'lead_time_hours': lead_time_hours
-            })
-    
-    df = pd.DataFrame(lead_times)
+            rows.append(i)
+            services.append(metric['service'])
+            commit_shas.append(lt.get('commit_sha', ''))
+            commit_timestamps.append(lt['commit_timestamp'])
+            deploy_timestamps.append(lt['deploy_timestamp'])
+    
+    df = pd.DataFrame({
+        'service': services,
+        'commit_sha': commit_shas,
+        'commit_timestamp': commit_timestamps,
+        'deploy_timestamp': deploy_timestamps
+    })
+    df['service'] = df['service'].astype('category')
     
     if df.empty:
         return pd.DataFrame()
     
-    df['date'] = pd.to_datetime(df['timestamp']).dt.date
+    # Parse all timestamps in one vectorized pass instead of per record
+    df['commit_timestamp'] = pd.to_datetime(df['commit_timestamp'], utc=True, format='ISO8601', cache=True)
+    df['deploy_timestamp'] = pd.to_datetime(df['deploy_timestamp'], utc=True, format='ISO8601', cache=True)
+    
+    # Subtract raw int64 nanoseconds, parsed resolution may differ per column
+    commit_ns = df['commit_timestamp'].dt.as_unit('ns').array.asi8
+    deploy_ns = df['deploy_timestamp'].dt.as_unit('ns').array.asi8
+    lead_time_ns = deploy_ns - commit_ns
+    
+    df['lead_time_seconds'] = lead_time_ns / 1_000_000_000
+    df['lead_time_minutes'] = lead_time_ns / 60_000_000_000
+    df['lead_time_hours'] = lead_time_ns / 3_600_000_000_000
+    
+    df.insert(0, 'timestamp', timestamps[rows])
+    df['date'] = df['timestamp'].dt.date
     
     # Average lead time per service per day
-    daily_avg = df.groupby(['date', 'service']).agg({
-        'lead_time_hours': ['mean', 'median', 'min', 'max']
-    }).reset_index()
+    service_names = df['service'].cat.categories
+    
+    if len(df) < NUMBA_MIN_ROWS and len(service_names) == 1:
+        # Most runs report a single service, so group on the date alone
+        daily_avg = df[df['service'].notna()].groupby('date').agg({
+            'lead_time_hours': ['mean', 'median', 'min', 'max']
+        }).reset_index()
+        daily_avg.insert(1, 'service', pd.Series(
+            service_names[0], index=daily_avg.index, dtype=service_names.dtype
+        ))
+        
+        daily_avg.columns = ['date', 'service', 'avg_lead_time_hours', 
+                              'median_lead_time_hours', 'min_lead_time_hours', 
+                              'max_lead_time_hours']
+        
+        return {
+            'daily_average': daily_avg,
+            'raw': df
+        }
+    
+    if len(df) < NUMBA_MIN_ROWS:
+        daily_avg = df.groupby(['date', 'service'], observed=True).agg({
+            'lead_time_hours': ['mean', 'median', 'min', 'max']
+        }).reset_index()
+        
+        daily_avg.columns = ['date', 'service', 'avg_lead_time_hours', 
+                              'median_lead_time_hours', 'min_lead_time_hours', 
+                              'max_lead_time_hours']
+        # Plain strings like every other table, not the grouping categorical
+        daily_avg['service'] = daily_avg['service'].astype(service_names.dtype)
+        
+        return {
+            'daily_average': daily_avg,
+            'raw': df
+        }
     
-    daily_avg.columns = ['date', 'service', 'avg_lead_time_hours', 
-                          'median_lead_time_hours', 'min_lead_time_hours', 
-                          'max_lead_time_hours']
+    # Rows without a service (code -1) are dropped, like groupby's NaN keys
+    service_codes = df['service'].cat.codes.to_numpy(dtype=np.int64)
+    known = service_codes >= 0
+    keys, group_ids = np.unique(
+        pack_keys(days[rows][known], service_codes[known], len(service_names)), return_inverse=True
+    )
+    
+    values = df['lead_time_hours'].to_numpy(dtype=np.float64)[known]
+    group_stats, group_medians = lead_time_kernels()
+    total, count, minimum, maximum = group_stats(group_ids, values, len(keys))
+    
+    order = np.argsort(group_ids, kind='stable')
+    offsets = np.concatenate(([0], np.cumsum(count)))
+    median = group_medians(values[order], offsets)
+    
+    day, service = unpack_keys(keys, len(service_names))
+    daily_avg = pd.DataFrame({
+        'date': pd.to_datetime(day, unit='D').date,
+        'service': service_names[service],
+        'avg_lead_time_hours': total / count,
+        'median_lead_time_hours': median,
+        'min_lead_time_hours': minimum,
+        'max_lead_time_hours': maximum
+    })
     
     return {
         'daily_average': daily_avg,
         'raw': df
     }
 
-def calculate_change_failure_rate(metrics):
+def count_outcomes(buckets, service_codes, service_names, failed):
+    """Count failures and successes per (bucket, service) with one bincount"""
+    bucket_codes, bucket_values = pd.factorize(buckets, sort=True)
+    n_buckets, n_services = len(bucket_values), len(service_names)
+    
+    keys = pack_keys(bucket_codes, service_codes, n_services) * 2 + failed
+    counts = np.bincount(keys, minlength=n_buckets * n_services * 2)
+    counts = counts.reshape(n_buckets, n_services, 2)
+    
+    # Keep only the (bucket, service) cells that actually saw changes
+    bucket_index, service_index = np.nonzero(counts.sum(axis=2))
+    cells = counts[bucket_index, service_index]
+    
+    return bucket_values[bucket_index], service_names[service_index], cells[:, 1], cells[:, 0]
+
+def calculate_change_failure_rate(metrics, timestamps, days, weeks):
     """Calculate change failure rate"""
     
-    changes = []
+    rows = []
+    services = []
+    statuses = []
+    workflow_run_ids = []
+    commit_shas = []
     
-    for metric in metrics:
+    for i, metric in enumerate(metrics):
         if 'change_failure_rate' in metric:
             cfr = metric['change_failure_rate']
             
-            changes.append({
-                'timestamp': metric['timestamp'],
-                'service': metric['service'],
-                'status': cfr['status'],
-                'workflow_run_id': cfr.get('workflow_run_id', ''),
-                'commit_sha': cfr.get('commit_sha', '')
-            })
-    
-    df = pd.DataFrame(changes)
+            rows.append(i)
+            services.append(metric['service'])
+            statuses.append(cfr['status'])
+            workflow_run_ids.append(cfr.get('workflow_run_id', ''))
+            commit_shas.append(cfr.get('commit_sha', ''))
+    
+    df = pd.DataFrame({
+        'service': services,
+        'status': statuses,
+        'workflow_run_id': workflow_run_ids,
+        'commit_sha': commit_shas
+    })
+    df['service'] = df['service'].astype('category')
+    df['status'] = df['status'].astype('category')
     
     if df.empty:
         return pd.DataFrame()
     
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    days, weeks = days[rows], weeks[rows]
+    
+    df.insert(0, 'timestamp', timestamps[rows])
     df['date'] = df['timestamp'].dt.date
+    df['week'] = pd.PeriodIndex.from_ordinals(weeks, freq='W')
     
-    # Calculate failure rate per service per day
-    daily_cfr = df.groupby(['date', 'service', 'status']).size().unstack(fill_value=0)
+    # Only successes and failures of a known service count towards the rate
+    service_codes = df['service'].cat.codes.to_numpy(dtype=np.int64)
+    service_names = df['service'].cat.categories
+    counted = df['status'].isin(['success', 'failure']).to_numpy() & (service_codes >= 0)
+    failed = (df['status'] == 'failure').to_numpy()[counted].astype(np.int64)
+    service_codes = service_codes[counted]
     
-    if 'success' not in daily_cfr.columns:
-        daily_cfr['success'] = 0
-    if 'failure' not in daily_cfr.columns:
-        daily_cfr['failure'] = 0
+    # Calculate failure rate per service per day
+    day, service, failure, success = count_outcomes(days[counted], service_codes, service_names, failed)
+    daily_cfr = pd.DataFrame({
+        'date': pd.to_datetime(day, unit='D').date,
+        'service': service,
+        'failure': failure,
+        'success': success
+    })
     
     daily_cfr['total_changes'] = daily_cfr['success'] + daily_cfr['failure']
     daily_cfr['failure_rate'] = (daily_cfr['failure'] / daily_cfr['total_changes'] * 100).round(2)
     daily_cfr['success_rate'] = (daily_cfr['success'] / daily_cfr['total_changes'] * 100).round(2)
     
-    daily_cfr = daily_cfr.reset_index()
-    
     # Weekly failure rate
-    df['week'] = df['timestamp'].dt.to_period('W')
-    weekly_cfr = df.groupby(['week', 'service', 'status']).size().unstack(fill_value=0)
-    
-    if 'success' not in weekly_cfr.columns:
-        weekly_cfr['success'] = 0
-    if 'failure' not in weekly_cfr.columns:
-        weekly_cfr['failure'] = 0
+    week, service, failure, success = count_outcomes(
+        weeks[counted], service_codes, service_names, failed
+    )
+    weekly_cfr = pd.DataFrame({
+        'week': pd.PeriodIndex.from_ordinals(week, freq='W').astype(str),
+        'service': service,
+        'failure': failure,
+        'success': success
+    })
     
     weekly_cfr['total_changes'] = weekly_cfr['success'] + weekly_cfr['failure']
     weekly_cfr['failure_rate'] = (weekly_cfr['failure'] / weekly_cfr['total_changes'] * 100).round(2)
-    weekly_cfr = weekly_cfr.reset_index()
-    weekly_cfr['week'] = weekly_cfr['week'].astype(str)
     
     return {
         'daily': daily_cfr,
@@ -185,10 +449,10 @@ def calculate_change_failure_rate(metrics):
     }
 
 def generate_powerbi_export():
-    """Generate CSV files for Power BI import"""
+    """Generate Parquet files for Power BI import"""
     
     print("Loading metrics...")
-    metrics = load_metrics()
+    metrics, timestamps = load_metrics()
     
     if not metrics:
         print("No metrics found")
@@ -200,51 +464,58 @@ def generate_powerbi_export():
     os.makedirs('metrics/aggregated', exist_ok=True)
     os.makedirs('metrics/powerbi', exist_ok=True)
     
+    # Bucket every timestamp once and share the buckets across calculators
+    days, weeks, months = bucket_timestamps(timestamps)
+    
     # Calculate metrics
     print("Calculating deployment frequency...")
-    deployment_freq = calculate_deployment_frequency(metrics)
+    deployment_freq = calculate_deployment_frequency(
+        metrics, timestamps, days=days, weeks=weeks, months=months
+    )
     
     print("Calculating lead time...")
-    lead_time = calculate_lead_time(metrics)
+    lead_time = calculate_lead_time(metrics, timestamps, days=days)
     
     print("Calculating change failure rate...")
-    change_failure_rate = calculate_change_failure_rate(metrics)
+    change_failure_rate = calculate_change_failure_rate(
+        metrics, timestamps, days=days, weeks=weeks
+    )
     
-    # Export to CSV for Power BI
+    # Export to Parquet for Power BI
     timestamp = datetime.now().strftime('%Y%m%d')
     
     if deployment_freq and not deployment_freq['daily'].empty:
-        deployment_freq['daily'].to_csv(
-            f'metrics/powerbi/deployment_frequency_daily_{timestamp}.csv', 
-            index=False
+        deployment_freq['daily'].to_parquet(
+            f'metrics/powerbi/deployment_frequency_daily_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
-        deployment_freq['weekly'].to_csv(
-            f'metrics/powerbi/deployment_frequency_weekly_{timestamp}.csv', 
-            index=False
+        deployment_freq['weekly'].to_parquet(
+            f'metrics/powerbi/deployment_frequency_weekly_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
-        deployment_freq['monthly'].to_csv(
-            f'metrics/powerbi/deployment_frequency_monthly_{timestamp}.csv', 
-            index=False
+        deployment_freq['monthly'].to_parquet(
+            f'metrics/powerbi/deployment_frequency_monthly_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
     
     if lead_time and not lead_time['daily_average'].empty:
-        lead_time['daily_average'].to_csv(
-            f'metrics/powerbi/lead_time_daily_{timestamp}.csv', 
-            index=False
+        lead_time['daily_average'].to_parquet(
+            f'metrics/powerbi/lead_time_daily_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
-        lead_time['raw'].to_csv(
-            f'metrics/powerbi/lead_time_raw_{timestamp}.csv', 
-            index=False
+        lead_time['raw'].to_parquet(
+            f'metrics/powerbi/lead_time_raw_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
     
     if change_failure_rate and not change_failure_rate['daily'].empty:
-        change_failure_rate['daily'].to_csv(
-            f'metrics/powerbi/change_failure_rate_daily_{timestamp}.csv', 
-            index=False
+        change_failure_rate['daily'].to_parquet(
+            f'metrics/powerbi/change_failure_rate_daily_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
-        change_failure_rate['weekly'].to_csv(
-            f'metrics/powerbi/change_failure_rate_weekly_{timestamp}.csv', 
-            index=False
+        change_failure_rate['weekly'].to_parquet(
+            f'metrics/powerbi/change_failure_rate_weekly_{timestamp}.parquet', 
+            engine='pyarrow', compression='zstd', index=False
         )
     
     # Generate summary report
@@ -252,13 +523,14 @@ def generate_powerbi_export():
         'generated_at': datetime.now().isoformat(),
         'total_metrics': len(metrics),
         'date_range': {
-            'start': min([m['timestamp'] for m in metrics]),
-            'end': max([m['timestamp'] for m in metrics])
+            'start': timestamps.min().isoformat(),
+            'end': timestamps.max().isoformat()
         }
     }
     
-    with open(f'metrics/aggregated/summary_{timestamp}.json', 'w') as f:
-        json.dump(summary, f, indent=2)
+    Path(f'metrics/aggregated/summary_{timestamp}.json').write_bytes(
+        orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    )
     
     print(f"Metrics aggregation complete. Files saved to metrics/powerbi/")
     print(f"Summary: {summary}")
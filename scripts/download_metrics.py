@@ -1,11 +1,70 @@
 """
 Download DORA metrics artifacts from GitHub Actions workflows
 """
+import io
 import os
+import re
+import sys
 import json
+import shutil
+import zipfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+# The artifacts API only filters by exact name, so match DORA artifacts client-side.
+# Skip this repo's own dora-metrics-aggregated-* uploads, they hold summaries, not metrics
+DORA_ARTIFACT_PATTERN = re.compile(r'^dora-metrics-(?!aggregated-)')
+
+RAW_DIR = 'metrics/raw'
+DOWNLOAD_LOG_PATH = 'metrics/.cache/download.log'
+
+def log_progress(progress, message):
+    """Record a progress message, echoing it only to an interactive terminal"""
+    progress.append(message)
+    if sys.stdout.isatty():
+        print(message)
+
+def prune_raw_dir(keep):
+    """Remove extracted artifacts that are no longer listed, e.g. expired ones"""
+    for entry in os.scandir(RAW_DIR):
+        if entry.name in keep:
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+
+def fetch_artifact(session, artifact, progress):
+    """Download a single artifact archive and extract it in memory"""
+    artifact_name = artifact['name']
+    artifact_url = artifact['archive_download_url']
+    target = os.path.join(RAW_DIR, artifact_name)
+    
+    # Artifact names carry the run id and never change, so an extracted
+    # artifact is kept as-is; its file mtimes then stay valid cache keys
+    if os.path.isdir(target):
+        return
+    
+    log_progress(progress, f"Downloading {artifact_name}...")
+    
+    response = session.get(artifact_url)
+    
+    if response.status_code != 200:
+        print(f"Error downloading {artifact_name}: {response.status_code}")
+        return
+    
+    # Unzip straight from the response body, no temporary .zip on disk.
+    # Extract next to the target and rename, so a failed run never leaves
+    # a partial directory that later runs would skip
+    staging = f'{target}.partial'
+    shutil.rmtree(staging, ignore_errors=True)
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zip_ref:
+        zip_ref.extractall(staging)
+    os.replace(staging, target)
+
 def download_metrics():
     """Download metrics artifacts from GitHub Actions"""
     
@@ -22,72 +81,69 @@ def download_metrics():
         'Accept': 'application/vnd.github.v3+json'
     }
     
+    # Reuse one keep-alive connection pool for all API and download requests
+    session = requests.Session()
+    session.headers.update(headers)
+    
+    # Retry transient API/download failures with exponential backoff and jitter
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=16))
+    
     # Create metrics directory
-    os.makedirs('metrics/raw', exist_ok=True)
+    os.makedirs(RAW_DIR, exist_ok=True)
     
     # Get workflow runs from the last 90 days
     since_date = (datetime.now() - timedelta(days=90)).isoformat()
     
-    # Fetch artifacts
+    # Fetch artifacts, following the Link: rel="next" header until the last page
     url = f'https://api.github.com/repos/{github_repository}/actions/artifacts'
-    params = {
-        'per_page': 100,
-        'page': 1
-    }
+    params = {'per_page': 100}
     
     all_artifacts = []
+    listing_complete = True
     
-    while True:
-        response = requests.get(url, headers=headers, params=params)
+    while url:
+        response = session.get(url, params=params)
         if response.status_code != 200:
             print(f"Error fetching artifacts: {response.status_code}")
+            listing_complete = False
             break
         
         data = response.json()
-        artifacts = data.get('artifacts', [])
-        
-        if not artifacts:
-            break
         
         # Filter DORA metrics artifacts
-        dora_artifacts = [
-            a for a in artifacts 
-            if 'dora-metrics' in a['name']
-        ]
-        
-        all_artifacts.extend(dora_artifacts)
+        all_artifacts.extend(
+            a for a in data.get('artifacts', [])
+            if DORA_ARTIFACT_PATTERN.search(a['name']) and not a.get('expired')
+        )
         
-        # Check if there are more pages
-        if len(artifacts) < 100:
-            break
-        
-        params['page'] += 1
+        # The next link already carries the query string
+        url = response.links.get('next', {}).get('url')
+        params = None
     
     print(f"Found {len(all_artifacts)} DORA metrics artifacts")
     
+    # Only prune against a full listing, a partial one would drop live artifacts
+    if listing_complete:
+        prune_raw_dir({a['name'] for a in all_artifacts})
+    
     # Download each artifact
-    for artifact in all_artifacts:
-        artifact_name = artifact['name']
-        artifact_url = artifact['archive_download_url']
-        
-        print(f"Downloading {artifact_name}...")
-        
-        response = requests.get(artifact_url, headers=headers)
-        
-        if response.status_code == 200:
-            filename = f"metrics/raw/{artifact_name}.zip"
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            
-            # Unzip the artifact
-            import zipfile
-            with zipfile.ZipFile(filename, 'r') as zip_ref:
-                zip_ref.extractall(f'metrics/raw/{artifact_name}')
-            
-            # Remove zip file
-            os.remove(filename)
-        else:
-            print(f"Error downloading {artifact_name}: {response.status_code}")
+    progress = []
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda a: fetch_artifact(session, a, progress), all_artifacts))
+    finally:
+        # Keep the progress log even when an artifact fails to download or extract
+        os.makedirs(os.path.dirname(DOWNLOAD_LOG_PATH), exist_ok=True)
+        with open(DOWNLOAD_LOG_PATH, 'w') as f:
+            f.writelines(f'{message}\n' for message in progress)
     
     print("Metrics download complete")
 